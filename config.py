@@ -10,14 +10,33 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent
 PAPERS_DIR = BASE_DIR / "data" / "papers"
 OUTPUT_DIR = BASE_DIR / "output"
+INDEX_DIR = OUTPUT_DIR / "index"  # persisted vector store for --qa reruns
 
 # --- LLM ---
 # using gpt-4o-mini to keep costs low -- still good quality for summaries
 LLM_MODEL = "gpt-4o-mini"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# --- Token budgets ---
+# per-paper cap on text sent to the reader -- leaves headroom in the 128k
+# context for the system/user prompts and the completion
+MAX_TOKENS_PER_PAPER = 90_000
+# source text cap for the grounding judge (roughly the old 30k chars)
+MAX_GROUNDING_SOURCE_TOKENS = 7_500
+# below this many chars of paper text, reader + analyst run as a single
+# LLM call instead of two (~25k tokens, so the JSON reply fits easily)
+FUSED_READER_MAX_CHARS = 100_000
+
 # --- RAG settings ---
 # 4000 chars per chunk (~1000 tokens), 200 char overlap so sentences
 # don't get cut at boundaries
 CHUNK_SIZE = 4000
 CHUNK_OVERLAP = 200
+# chunks per embeddings request -- ~100k tokens, well under the API's
+# per-request token limit even with several long papers
+EMBEDDING_BATCH_SIZE = 100
+
+# --- Concurrency ---
+# max in-flight LLM calls when fanning out per-paper requests -- keeps
+# us under the OpenAI rate limit when there are lots of papers
+MAX_CONCURRENT_REQUESTS = 8
@@ -0,0 +1,91 @@
+"""
+Thin wrapper around the OpenAI Batch API for the evaluation judge calls.
+
+Judging isn't latency-sensitive, so instead of firing blocking
+chat.completions calls we can submit them as a batch: half the price
+and no synchronous rate limits. The trade-off is that results can take
+up to 24h, hence the separate submit / collect steps.
+"""
+
+import io
+import json
+import time
+
+from openai import OpenAI
+
+ENDPOINT = "/v1/chat/completions"
+
+
+def submit_batch(client: OpenAI, prompts: list[dict]) -> str:
+    """Uploads the requests as a JSONL file and starts a batch job.
+
+    Each prompt is {"custom_id": ..., "body": <chat.completions kwargs>}.
+    Returns the batch id, which is all we need to collect results later.
+    """
+    lines = [
+        json.dumps({
+            "custom_id": prompt["custom_id"],
+            "method": "POST",
+            "url": ENDPOINT,
+            "body": prompt["body"],
+        })
+        for prompt in prompts
+    ]
+    jsonl = io.BytesIO("\n".join(lines).encode("utf-8"))
+
+    batch_file = client.files.create(
+        file=("evaluation_batch.jsonl", jsonl),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def collect_batch(
+    client: OpenAI, batch_id: str, custom_ids: list[str], poll_interval: int = 30
+) -> dict[str, str]:
+    """Waits for the batch to finish and returns message content by custom_id.
+
+    Polls every poll_interval seconds. Raises RuntimeError if the batch
+    ends in a non-completed state, any request failed, or any of the
+    submitted custom_ids didn't come back.
+    """
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            break
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+        print(f"  Batch {batch_id} is {batch.status}, checking again in {poll_interval}s...")
+        time.sleep(poll_interval)
+
+    # failed requests go to a separate error file, not the output file
+    if batch.error_file_id or (batch.request_counts and batch.request_counts.failed):
+        errors = ""
+        if batch.error_file_id:
+            errors = client.files.content(batch.error_file_id).text.strip()
+        raise RuntimeError(f"Batch {batch_id} had failed requests:\n{errors}")
+
+    if not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch_id} completed without any output")
+
+    output = client.files.content(batch.output_file_id).text
+
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            raise RuntimeError(f"Request {record['custom_id']} failed: {record.get('error')}")
+        results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+    missing = [custom_id for custom_id in custom_ids if custom_id not in results]
+    if missing:
+        raise RuntimeError(f"Batch {batch_id} is missing results for: {', '.join(missing)}")
+    return results
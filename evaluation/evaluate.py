@@ -9,15 +9,30 @@ Runs three checks against the generated summary:
 Usage:
     python -m evaluation.evaluate
     python -m evaluation.evaluate --summary output/summary.md --papers data/papers/
+
+    # cheaper, async variant via the OpenAI Batch API
+    python -m evaluation.evaluate --submit    # queue the judge calls
+    python -m evaluation.evaluate --collect   # wait for results and score
 """
 
 import argparse
 import json
+import re
 from pathlib import Path
 
 from openai import OpenAI
 
-from config import PAPERS_DIR, OUTPUT_DIR
+# orjson is an optional speedup -- stdlib json works fine without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import PAPERS_DIR, OUTPUT_DIR, MAX_GROUNDING_SOURCE_TOKENS
+from evaluation.batch import submit_batch, collect_batch
+from openai_client import CLIENT
+from pdf_text import extract_pdf_pages
+from tokens import truncate_to_tokens
 
 # cheaper model for judging -- evaluation is simpler than summarization
 JUDGE_MODEL = "gpt-4o-mini"
@@ -32,15 +47,19 @@ REQUIRED_SECTIONS = [
     "Key Takeaways",
 ]
 
+# one alternation over all section names so the summary is scanned once
+_COVERAGE_RE = re.compile("|".join(re.escape(sec.lower()) for sec in REQUIRED_SECTIONS))
+
 
 def evaluate_coverage(summary: str) -> dict:
     """Checks if all required section headings are in the summary.
     No LLM needed -- just string matching.
     """
+    present = set(_COVERAGE_RE.findall(summary.lower()))
     found = []
     missing = []
     for section in REQUIRED_SECTIONS:
-        if section.lower() in summary.lower():
+        if section.lower() in present:
             found.append(section)
         else:
             missing.append(section)
@@ -54,8 +73,19 @@ def evaluate_coverage(summary: str) -> dict:
     }
 
 
-def evaluate_coherence(client: OpenAI, summary: str) -> dict:
-    """Has GPT-4o-mini rate the summary's structure and clarity 1-5.
+def _loads(content: str):
+    return orjson.loads(content) if orjson else json.loads(content)
+
+
+def _write_json(path: Path, data: dict):
+    if orjson:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, indent=2))
+
+
+def coherence_request(summary: str) -> dict:
+    """Builds the chat.completions kwargs for the coherence judge.
     Uses temperature=0 so scores are reproducible across runs.
     """
     prompt = (
@@ -70,15 +100,17 @@ def evaluate_coherence(client: OpenAI, summary: str) -> dict:
         '  "reasoning": "<brief explanation>"\n\n'
         f"Summary to evaluate:\n\n{summary}"
     )
+    return {
+        "model": JUDGE_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "response_format": {"type": "json_object"},
+        "temperature": 0,
+    }
 
-    response = client.chat.completions.create(
-        model=JUDGE_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"},
-        temperature=0,
-    )
 
-    result = json.loads(response.choices[0].message.content)
+def parse_coherence(content: str) -> dict:
+    """Turns the judge's JSON reply into the coherence result dict."""
+    result = _loads(content)
     return {
         "metric": "coherence",
         "score": round(result["score"] / 5, 2),
@@ -87,14 +119,21 @@ def evaluate_coherence(client: OpenAI, summary: str) -> dict:
     }
 
 
-def evaluate_grounding(client: OpenAI, summary: str, source_text: str) -> dict:
-    """Hallucination detector -- compares summary claims against the source.
+def evaluate_coherence(client: OpenAI, summary: str) -> dict:
+    """Has GPT-4o-mini rate the summary's structure and clarity 1-5."""
+    response = client.chat.completions.create(**coherence_request(summary))
+    return parse_coherence(response.choices[0].message.content)
+
+
+def grounding_request(summary: str, source_text: str) -> dict:
+    """Builds the chat.completions kwargs for the grounding judge.
     Gives the judge both texts and asks it to flag anything not supported.
     """
     # cap source text so we don't blow the context window
-    max_source = 30_000
-    if len(source_text) > max_source:
-        source_text = source_text[:max_source] + "\n[...truncated...]"
+    source_text = truncate_to_tokens(
+        source_text, MAX_GROUNDING_SOURCE_TOKENS, model=JUDGE_MODEL,
+        marker="\n[...truncated...]",
+    )
 
     prompt = (
         "You are evaluating whether a research paper summary is factually grounded "
@@ -109,15 +148,17 @@ def evaluate_grounding(client: OpenAI, summary: str, source_text: str) -> dict:
         f"SOURCE TEXT:\n{source_text}\n\n"
         f"SUMMARY TO EVALUATE:\n{summary}"
     )
+    return {
+        "model": JUDGE_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "response_format": {"type": "json_object"},
+        "temperature": 0,
+    }
 
-    response = client.chat.completions.create(
-        model=JUDGE_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"},
-        temperature=0,
-    )
 
-    result = json.loads(response.choices[0].message.content)
+def parse_grounding(content: str) -> dict:
+    """Turns the judge's JSON reply into the grounding result dict."""
+    result = _loads(content)
     return {
         "metric": "grounding",
         "score": round(result["score"] / 5, 2),
@@ -127,64 +168,57 @@ def evaluate_grounding(client: OpenAI, summary: str, source_text: str) -> dict:
     }
 
 
+def evaluate_grounding(client: OpenAI, summary: str, source_text: str) -> dict:
+    """Hallucination detector -- compares summary claims against the source."""
+    response = client.chat.completions.create(**grounding_request(summary, source_text))
+    return parse_grounding(response.choices[0].message.content)
+
+
 def load_source_text(papers_dir: Path) -> str:
     """Extracts text from all PDFs for the grounding check."""
-    import pypdfium2 as pdfium
-
-    all_text = []
-    for pdf_path in sorted(papers_dir.glob("*.pdf")):
-        pdf = pdfium.PdfDocument(str(pdf_path))
-        pages = []
-        for i in range(len(pdf)):
-            page = pdf[i]
-            textpage = page.get_textpage()
-            pages.append(textpage.get_text_range())
-            textpage.close()
-            page.close()
-        pdf.close()
-        all_text.append(f"=== {pdf_path.name} ===\n" + "\n".join(pages))
-
+    all_text = [
+        f"=== {name} ===\n" + "\n".join(pages)
+        for name, pages in extract_pdf_pages(papers_dir).items()
+    ]
     return "\n\n".join(all_text)
 
 
-def run_evaluation(summary_path: Path, papers_dir: Path):
-    """Runs all three metrics and saves results as JSON."""
+def _read_summary(summary_path: Path) -> str:
     summary = summary_path.read_text()
     if not summary.strip():
         print("Error: Summary file is empty.")
         raise SystemExit(1)
+    return summary
 
-    client = OpenAI()
 
-    print("Running evaluation...\n")
+def _skipped_grounding() -> dict:
+    print("Grounding: skipped (no source PDFs found)")
+    return {"metric": "grounding", "score": None, "note": "No source text"}
 
-    # 1. coverage (free, no API call)
-    coverage = evaluate_coverage(summary)
-    print(f"Coverage:  {coverage['score']:.0%}")
-    if coverage["missing_sections"]:
-        print(f"  Missing: {', '.join(coverage['missing_sections'])}")
 
-    # 2. coherence (1 API call)
-    coherence = evaluate_coherence(client, summary)
+def _print_coherence(coherence: dict):
     print(f"Coherence: {coherence['score']:.0%} ({coherence['raw_score']}/5)")
     print(f"  {coherence['reasoning']}")
 
-    # 3. grounding (1 API call)
-    source_text = load_source_text(papers_dir)
-    if source_text.strip():
-        grounding = evaluate_grounding(client, summary, source_text)
-        print(f"Grounding: {grounding['score']:.0%}")
-        print(f"  Supported: {grounding['supported_claims']}, "
-              f"Unsupported: {grounding['unsupported_claims']}")
-        if grounding["flagged"]:
-            print("  Flagged claims:")
-            for claim in grounding["flagged"]:
-                print(f"    - {claim}")
-    else:
-        grounding = {"metric": "grounding", "score": None, "note": "No source text"}
-        print("Grounding: skipped (no source PDFs found)")
 
-    # overall average
+def _print_grounding(grounding: dict):
+    print(f"Grounding: {grounding['score']:.0%}")
+    print(f"  Supported: {grounding['supported_claims']}, "
+          f"Unsupported: {grounding['unsupported_claims']}")
+    if grounding["flagged"]:
+        print("  Flagged claims:")
+        for claim in grounding["flagged"]:
+            print(f"    - {claim}")
+
+
+def _print_coverage(coverage: dict):
+    print(f"Coverage:  {coverage['score']:.0%}")
+    if coverage["missing_sections"]:
+        print(f"  Missing: {', '.join(coverage['missing_sections'])}")
+
+
+def _save_results(summary_path: Path, coverage: dict, coherence: dict, grounding: dict):
+    """Averages the scores, prints the overall, and writes the JSON."""
     scores = [r["score"] for r in [coverage, coherence, grounding] if r["score"] is not None]
     overall = sum(scores) / len(scores) if scores else 0
     print(f"\nOverall:   {overall:.0%}")
@@ -197,14 +231,119 @@ def run_evaluation(summary_path: Path, papers_dir: Path):
         "overall_score": round(overall, 2),
     }
     results_path = summary_path.parent / "evaluation_results.json"
-    results_path.write_text(json.dumps(results, indent=2))
+    _write_json(results_path, results)
     print(f"\nDetailed results saved to {results_path}")
 
 
+def run_evaluation(summary_path: Path, papers_dir: Path):
+    """Runs all three metrics synchronously and saves results as JSON."""
+    summary = _read_summary(summary_path)
+
+    print("Running evaluation...\n")
+
+    # 1. coverage (free, no API call)
+    coverage = evaluate_coverage(summary)
+    _print_coverage(coverage)
+
+    # 2. coherence (1 API call)
+    coherence = evaluate_coherence(CLIENT, summary)
+    _print_coherence(coherence)
+
+    # 3. grounding (1 API call)
+    source_text = load_source_text(papers_dir)
+    if source_text.strip():
+        grounding = evaluate_grounding(CLIENT, summary, source_text)
+        _print_grounding(grounding)
+    else:
+        grounding = _skipped_grounding()
+
+    _save_results(summary_path, coverage, coherence, grounding)
+
+
+def _pending_path(summary_path: Path) -> Path:
+    return summary_path.parent / "evaluation_batch.json"
+
+
+def submit_evaluation(summary_path: Path, papers_dir: Path):
+    """Phase 1 of batch mode: queues the judge calls on the Batch API.
+
+    Stores the batch id, request ids, and the summary text that was
+    judged -- collect_evaluation() picks them up later.
+    """
+    summary = _read_summary(summary_path)
+
+    prompts = [{"custom_id": "coherence", "body": coherence_request(summary)}]
+    source_text = load_source_text(papers_dir)
+    if source_text.strip():
+        prompts.append({
+            "custom_id": "grounding",
+            "body": grounding_request(summary, source_text),
+        })
+
+    batch_id = submit_batch(CLIENT, prompts)
+    pending_path = _pending_path(summary_path)
+    custom_ids = [prompt["custom_id"] for prompt in prompts]
+    pending_path.write_text(json.dumps({
+        "batch_id": batch_id,
+        "custom_ids": custom_ids,
+        "summary": summary,
+    }, indent=2))
+    print(f"Submitted {len(prompts)} judge request(s) as batch {batch_id}")
+    print("Collect results with: python -m evaluation.evaluate --collect")
+
+
+def collect_evaluation(summary_path: Path):
+    """Phase 2 of batch mode: waits for the batch and scores the results.
+
+    Coverage is computed from the summary saved at submit time, so all
+    three metrics describe the same text even if the pipeline has
+    rewritten summary.md since.
+    """
+    pending_path = _pending_path(summary_path)
+    if not pending_path.exists():
+        print(f"No pending batch found at {pending_path}")
+        print("Submit one first: python -m evaluation.evaluate --submit")
+        raise SystemExit(1)
+
+    pending = json.loads(pending_path.read_text())
+    batch_id = pending["batch_id"]
+    summary = pending["summary"]
+    if summary_path.read_text() != summary:
+        print("Note: summary.md changed since submission -- scoring the "
+              "submitted version.\n")
+
+    print(f"Collecting batch {batch_id}...\n")
+    try:
+        outputs = collect_batch(CLIENT, batch_id, pending["custom_ids"])
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    coverage = evaluate_coverage(summary)
+    _print_coverage(coverage)
+
+    coherence = parse_coherence(outputs["coherence"])
+    _print_coherence(coherence)
+
+    if "grounding" in outputs:
+        grounding = parse_grounding(outputs["grounding"])
+        _print_grounding(grounding)
+    else:
+        grounding = _skipped_grounding()
+
+    _save_results(summary_path, coverage, coherence, grounding)
+    pending_path.unlink()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Evaluate research paper summary quality")
     parser.add_argument("--summary", type=Path, default=OUTPUT_DIR / "summary.md")
     parser.add_argument("--papers", type=Path, default=PAPERS_DIR)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--submit", action="store_true",
+                      help="queue the judge calls on the Batch API and exit")
+    mode.add_argument("--collect", action="store_true",
+                      help="wait for a submitted batch and score the results")
     args = parser.parse_args()
 
     if not args.summary.exists():
@@ -212,7 +351,12 @@ def main():
         print("Run the pipeline first: python run.py")
         raise SystemExit(1)
 
-    run_evaluation(args.summary, args.papers)
+    if args.submit:
+        submit_evaluation(args.summary, args.papers)
+    elif args.collect:
+        collect_evaluation(args.summary)
+    else:
+        run_evaluation(args.summary, args.papers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+"""
+Shared OpenAI clients.
+
+Every OpenAI() instance opens its own HTTP connection pool, so having
+one per module meant each module paid its own TLS handshake on first
+use. Everything imports the clients from here instead, so keep-alive
+connections get reused across the graph nodes, RAG, and evaluation.
+"""
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_TIMEOUT = 60
+
+# sync client -- RAG, the Q&A loop, and evaluation
+CLIENT = OpenAI(http_client=httpx.Client(limits=_LIMITS, timeout=_TIMEOUT))
+
+# async client -- graph nodes running under app.ainvoke()
+ACLIENT = AsyncOpenAI(http_client=httpx.AsyncClient(limits=_LIMITS, timeout=_TIMEOUT))
@@ -0,0 +1,117 @@
+"""
+PDF text extraction shared by the pipeline and the evaluation module.
+
+Both run.py and evaluation/evaluate.py need the raw text of every PDF
+in the papers folder, so the extraction lives here instead of being
+copy-pasted in two places.
+
+Multiple PDFs are extracted in a process pool, one task per PDF.
+PDFium is not thread-safe (not even across separate documents), so
+threads are off the table -- each worker process gets its own copy of
+the library instead.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pypdfium2 as pdfium
+
+
+def _page_text(textpage):
+    """Reads all text off a text page.
+
+    Bails out early on pages with no text at all (figures, scanned
+    images) so they skip the get_text_range() call and its copy.
+    """
+    if textpage.count_chars() <= 0:
+        return ""
+    return textpage.get_text_range()
+
+
+def _extract_one(pdf_path):
+    """Opens one PDF and returns (filename, list of page texts)."""
+    doc = pdfium.PdfDocument(str(pdf_path))
+    pages = []
+    for i in range(len(doc)):
+        page = doc[i]
+        textpage = page.get_textpage()
+        text = _page_text(textpage)
+        if text:
+            pages.append(text)
+        textpage.close()
+        page.close()
+    doc.close()
+    return pdf_path.name, pages
+
+
+def extract_pdf_pages(papers_dir: Path) -> dict[str, list[str]]:
+    """Extracts page text from every PDF in papers_dir, in parallel.
+
+    Returns a dict keyed by filename, in sorted filename order (same
+    order the old serial loop produced), with one string per page.
+    A single PDF is read in-process -- not worth spinning up a pool.
+    """
+    pdf_paths = sorted(papers_dir.glob("*.pdf"))
+    if len(pdf_paths) <= 1:
+        return dict(_extract_one(path) for path in pdf_paths)
+
+    workers = min(len(pdf_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() yields results in submission order, so sorting is preserved
+        results = executor.map(_extract_one, pdf_paths)
+        return dict(results)
+
+
+# "Abstract" heading, optionally followed by punctuation (Abstract. / Abstract— / ABSTRACT:)
+_ABSTRACT_HEADER_RE = re.compile(r"^\s*abstract\b[\s.:\u2014-]*", re.IGNORECASE | re.MULTILINE)
+# where the abstract ends: a blank line or the Introduction heading
+_ABSTRACT_END_RE = re.compile(
+    r"\n\s*\n|^\s*(?:1\.?|I\.)?\s*introduction\b", re.IGNORECASE | re.MULTILINE
+)
+
+
+def _authors(lines, abstract_start):
+    """Everything between the title line and the Abstract heading --
+    on most papers that's the author names and affiliations."""
+    block = lines[1:abstract_start] if abstract_start is not None else lines[1:4]
+    return " ".join(" ".join(block).split())[:300]
+
+
+def _abstract(first_page, start):
+    header = _ABSTRACT_HEADER_RE.search(first_page, start)
+    if not header:
+        return ""
+    rest = first_page[header.end():]
+    end = _ABSTRACT_END_RE.search(rest)
+    body = rest[:end.start()] if end else rest
+    return " ".join(body.split())[:2000]
+
+
+def parse_paper_meta(first_page: str) -> dict[str, str]:
+    """Pulls title, authors, and abstract off a paper's first page.
+
+    Plain heuristics, no LLM: the title is the first non-empty line,
+    the authors are whatever sits between it and the Abstract heading,
+    and the abstract runs until a blank line or the Introduction.
+    Fields that can't be found come back as empty strings.
+    """
+    first_page = first_page.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line.strip() for line in first_page.split("\n") if line.strip()]
+
+    if not lines:
+        return {"title": "", "authors": "", "abstract": ""}
+
+    # only look for the Abstract heading after the title line, so a
+    # title like "Abstract Interpretation Revisited" isn't mistaken for it
+    abstract_start = next(
+        (i for i, line in enumerate(lines[1:], start=1) if _ABSTRACT_HEADER_RE.match(line)),
+        None,
+    )
+    title_end = first_page.index(lines[0]) + len(lines[0])
+    return {
+        "title": lines[0],
+        "authors": _authors(lines, abstract_start),
+        "abstract": _abstract(first_page, title_end),
+    }
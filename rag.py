@@ -1,21 +1,138 @@
 """
 RAG module for the Q&A mode.
 
-Handles chunking paper text, embedding into ChromaDB, and retrieving
-relevant passages when the user asks questions.
+Handles chunking paper text, embedding it into a flat in-memory
+vector store (persisted to disk between runs), and retrieving relevant
+passages when the user asks questions.
 
 I only use RAG for Q&A, not for the main pipeline -- the full paper
 text fits in gpt-4o-mini's 128k context window, so RAG would just
 add overhead there. But for Q&A it makes sense because you don't want
 to stuff the entire paper into every single question prompt.
+
+The store is just a normalized embedding matrix -- for a handful of
+papers (a few thousand chunks at most) one matrix-vector product is
+faster than an ANN index like HNSW, and there's no index to build.
+Embeddings are kept as int8 with a single scale factor, which is a
+quarter of the memory of float32 and barely moves top-k rankings.
 """
 
-import chromadb
-from openai import OpenAI
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_BATCH_SIZE, INDEX_DIR
+from openai_client import CLIENT as client
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+@dataclass
+class FlatStore:
+    """Chunk texts plus their L2-normalized embeddings, one row each.
+
+    Embeddings are quantized to int8: the float value of a row is
+    embeddings / scale. Since rows are unit length, cosine similarity
+    against a normalized query is (embeddings @ query) / scale.
+    """
+    embeddings: np.ndarray  # (n_chunks, dim) int8
+    scale: float
+    docs: list[str]
+    ids: list[str]
+
+    def __len__(self):
+        return len(self.docs)
+
+    def scores(self, queries, block_rows=1024):
+        """Cosine similarity of every chunk against each normalized query.
+
+        numpy has no fast int8 matmul, so rows get upcast to float32 for
+        a BLAS product -- but only block_rows at a time, so a query never
+        holds a full float32 copy of the matrix in memory.
+        """
+        out = np.empty((len(self.embeddings), len(queries)), dtype=np.float32)
+        for start in range(0, len(self.embeddings), block_rows):
+            block = self.embeddings[start:start + block_rows].astype(np.float32)
+            out[start:start + block_rows] = block @ queries.T
+        return out / self.scale
 
-from config import CHUNK_SIZE, CHUNK_OVERLAP
+    def save(self, path):
+        """Writes the store to path atomically.
 
-client = OpenAI()
+        Saves to a temp file in the same directory and renames it over
+        path, so an interrupted save never leaves a half-written index.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        docs_blob, docs_offsets = _pack_strings(self.docs)
+        ids_blob, ids_offsets = _pack_strings(self.ids)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    embeddings=self.embeddings,
+                    scale=np.float32(self.scale),
+                    docs_blob=docs_blob,
+                    docs_offsets=docs_offsets,
+                    ids_blob=ids_blob,
+                    ids_offsets=ids_offsets,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                embeddings=data["embeddings"],
+                scale=float(data["scale"]),
+                docs=_unpack_strings(data["docs_blob"], data["docs_offsets"]),
+                ids=_unpack_strings(data["ids_blob"], data["ids_offsets"]),
+            )
+
+
+def _pack_strings(strings):
+    """Encodes strings as one UTF-8 byte blob plus end offsets.
+
+    np.array(list_of_str) would pad every entry to the longest one in
+    4-byte UCS-4, which for 4000-char chunks dwarfs the int8 embeddings.
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    offsets = np.cumsum([len(data) for data in encoded], dtype=np.int64)
+    return blob, offsets
+
+
+def _unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    starts = [0] + offsets[:-1].tolist()
+    return [data[start:end].decode("utf-8") for start, end in zip(starts, offsets.tolist())]
+
+
+def _normalize_rows(x):
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def _quantize(x):
+    """Per-tensor symmetric int8 quantization. Returns (int8 matrix, scale).
+
+    The scale maps the largest absolute value to 127, so the full int8
+    range is used (normalized embedding components are all well under 1).
+    """
+    max_abs = float(np.abs(x).max()) if x.size else 0.0
+    scale = 127 / max_abs if max_abs > 0 else 1.0
+    q = np.clip(np.round(x * scale), -127, 127).astype(np.int8)
+    return q, scale
 
 
 def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
@@ -23,76 +140,187 @@ def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
 
     Overlap ensures we don't lose context at chunk boundaries --
     the end of one chunk overlaps with the start of the next.
+    Offsets are computed up front with numpy so the only Python-level
+    work left is the slicing itself.
     """
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunks.append(text[start:end])
-        start = end - overlap
-    return chunks
+    starts = np.arange(0, len(text), chunk_size - overlap)
+    ends = np.minimum(starts + chunk_size, len(text))
+    return [text[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+def _corpus_hash(paper_texts):
+    """Short fingerprint of the papers, used as the index filename so
+    a changed corpus never reuses a stale index."""
+    digest = hashlib.sha256()
+    for name in sorted(paper_texts):
+        digest.update(name.encode())
+        digest.update(paper_texts[name].encode())
+    return digest.hexdigest()[:16]
+
 
+def build_vector_store(paper_texts, cancel_event=None):
+    """Chunks all papers, embeds them, and returns a FlatStore.
 
-def build_vector_store(paper_texts):
-    """Chunks all papers, embeds them, and stores in ChromaDB.
+    Embeds chunks in batches of EMBEDDING_BATCH_SIZE rather than
+    one-by-one -- way cheaper and faster, while keeping each request
+    under the API's token limit. Returns the store so we can query it
+    later in the Q&A loop.
 
-    Does a single batch embedding call for all chunks rather than
-    one-by-one -- way cheaper and faster. Returns the collection
-    so we can query it later in the Q&A loop.
+    If cancel_event (a threading.Event) gets set, stops before the next
+    batch and returns None without saving anything.
+
+    The store is persisted under output/index and keyed by a hash of
+    the paper texts, so re-running --qa on the same papers just loads
+    the existing index instead of re-embedding everything.
     """
-    chroma_client = chromadb.Client()  # in-memory, lives for the session
-    collection = chroma_client.create_collection(
-        name="papers",
-        metadata={"hnsw:space": "cosine"},
-    )
+    # "_int8" so indexes saved before quantization are never picked up
+    index_path = INDEX_DIR / f"papers_{_corpus_hash(paper_texts)}_int8.npz"
 
     all_chunks = []
     all_ids = []
-    all_metadata = []
 
     for filename, text in paper_texts.items():
         chunks = chunk_text(text)
         for i, chunk in enumerate(chunks):
             all_chunks.append(chunk)
             all_ids.append(f"{filename}_chunk_{i}")
-            all_metadata.append({"source": filename, "chunk_index": i})
 
     if not all_chunks:
-        return collection
+        return FlatStore(np.empty((0, 0), dtype=np.int8), 1.0, [], [])
 
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=all_chunks,
-    )
-    embeddings = [item.embedding for item in response.data]
+    if index_path.exists():
+        try:
+            store = FlatStore.load(index_path)
+        except Exception:
+            # older layout or a damaged file (np.load can raise BadZipFile,
+            # EOFError, KeyError, ...) -- just rebuild
+            store = None
+        if store is not None and len(store) == len(all_chunks):
+            print(f"  Loaded existing index ({len(all_chunks)} chunks)")
+            return store
+
+    vectors = []
+    for start in range(0, len(all_chunks), EMBEDDING_BATCH_SIZE):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=all_chunks[start:start + EMBEDDING_BATCH_SIZE],
+        )
+        vectors.extend(item.embedding for item in response.data)
 
-    collection.add(
-        documents=all_chunks,
+    embeddings, scale = _quantize(_normalize_rows(vectors))
+    store = FlatStore(
         embeddings=embeddings,
+        scale=scale,
+        docs=all_chunks,
         ids=all_ids,
-        metadatas=all_metadata,
     )
+    store.save(index_path)
 
     print(f"  Indexed {len(all_chunks)} chunks from {len(paper_texts)} paper(s)")
-    return collection
+    return store
 
 
-def retrieve(collection, question, top_k=5):
-    """Finds the most relevant chunks for a given question.
+async def build_vector_store_async(paper_texts, cancel_event=None):
+    """Runs build_vector_store in a worker thread.
 
-    Embeds the question with the same model used for indexing,
-    then queries ChromaDB for the top-k nearest neighbors.
-    5 chunks is usually enough context without blowing up token costs.
+    Lets run.py kick off the (slow, network-bound) indexing as a
+    background task while the summarization graph is still running.
+    Cancelling the task can't stop the thread, so pass cancel_event
+    to stop it between batches.
     """
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=[question],
-    )
-    query_embedding = response.data[0].embedding
+    return await asyncio.to_thread(build_vector_store, paper_texts, cancel_event)
 
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-    )
 
-    return results["documents"][0] if results["documents"] else []
+# query embedding cache: normalized question -> embedding tuple, in
+# least-recently-used order. A plain dict + lock rather than lru_cache so
+# a multi-part question can look up and fill entries for each part.
+_QUERY_CACHE_SIZE = 1024
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def _normalize(question):
+    """Lowercase + collapse whitespace so trivial rephrasings hit the cache.
+    Only used as the cache key -- the model still sees the original text."""
+    return " ".join(question.lower().split())
+
+
+def embed_queries(questions):
+    """Embeds one or more questions, with caching.
+
+    Each question is looked up by its normalized form. All the misses
+    are sent as one batched embeddings call (so a multi-part query costs
+    at most one round-trip) and stored back in the cache. Asking the
+    same thing twice in a session doesn't cost another API call.
+    """
+    keys = [_normalize(q) for q in questions]
+
+    with _query_cache_lock:
+        found = {}
+        for key in keys:
+            if key in _query_cache:
+                _query_cache.move_to_end(key)
+                found[key] = _query_cache[key]
+
+    # first original text for each distinct uncached key
+    misses = {}
+    for key, question in zip(keys, questions):
+        if key not in found:
+            misses.setdefault(key, question)
+
+    if misses:
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL, input=list(misses.values())
+        )
+        fetched = {
+            key: tuple(item.embedding) for key, item in zip(misses, response.data)
+        }
+        found.update(fetched)
+        with _query_cache_lock:
+            _query_cache.update(fetched)
+            while len(_query_cache) > _QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+
+    return [list(found[key]) for key in keys]
+
+
+def retrieve(store, questions, top_k=5):
+    """Finds the most relevant chunks for one or more questions.
+
+    Embeds the question(s) with the same model used for indexing,
+    then scores every chunk with a single matrix product and takes
+    the top-k of each. For multi-part questions the results are merged
+    (deduped, in rank order) so the LLM sees the union of relevant
+    chunks. 5 chunks is usually enough context without blowing up
+    token costs.
+    """
+    if isinstance(questions, str):
+        questions = [questions]
+    if not len(store):
+        return []
+
+    queries = _normalize_rows(embed_queries(questions))
+    scores = store.scores(queries)  # (n_chunks, n_questions)
+
+    k = min(top_k, len(store))
+    merged = {}
+    for column in scores.T:
+        # argpartition finds the top-k without a full sort, then we only
+        # sort those k by score
+        top = np.argpartition(-column, k - 1)[:k]
+        for i in top[np.argsort(-column[top])]:
+            # dict keeps first-seen order while dropping duplicates
+            merged.setdefault(store.docs[i])
+    return list(merged)
+
+
+async def aretrieve(store, questions, top_k=5):
+    """Async version of retrieve() for the Q&A loop.
+
+    Both the embeddings call and the scoring are blocking, so the
+    whole retrieval runs in a worker thread. Going through retrieve()
+    keeps the query embedding cache in play.
+    """
+    return await asyncio.to_thread(retrieve, store, questions, top_k)
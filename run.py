@@ -9,50 +9,74 @@ Usage:
   python run.py --qa         # Q&A only on existing summary
 """
 
+import asyncio
+import re
 import sys
+import threading
 from pathlib import Path
 
-import pypdfium2 as pdfium
-from openai import OpenAI
 from langgraph.graph import StateGraph, START, END
-
-from config import PAPERS_DIR, OUTPUT_DIR, LLM_MODEL
-from nodes import reader_node, analyst_node, writer_node
+from openai import OpenAIError
+
+from config import (
+    PAPERS_DIR, OUTPUT_DIR, LLM_MODEL, MAX_TOKENS_PER_PAPER, FUSED_READER_MAX_CHARS,
+)
+from nodes import reader_node, analyst_node, reader_analyst_node, writer_node
+from openai_client import ACLIENT as aclient
+from pdf_text import extract_pdf_pages, parse_paper_meta
 from state import PipelineState
-from rag import build_vector_store, retrieve
+from tokens import truncate_to_tokens
+from rag import build_vector_store_async, aretrieve
 
 
 def load_paper_texts():
-    """Reads all PDFs from data/papers/ and returns them as a dict."""
+    """Reads all PDFs from data/papers/.
+
+    Returns (paper_texts, paper_meta), both keyed by filename. The meta
+    (title/authors/abstract) is parsed straight off the first page so
+    the LLM doesn't have to spend output tokens extracting it.
+    """
     paper_texts = {}
-    for pdf_file in sorted(PAPERS_DIR.glob("*.pdf")):
-        doc = pdfium.PdfDocument(str(pdf_file))
-        pages = []
-        for i in range(len(doc)):
-            page = doc[i]
-            textpage = page.get_textpage()
-            pages.append(textpage.get_text_range())
-            textpage.close()
-            page.close()
-        doc.close()
-        paper_texts[pdf_file.name] = "\n\n".join(pages)[:80_000]
-    return paper_texts
+    paper_meta = {}
+    for name, pages in extract_pdf_pages(PAPERS_DIR).items():
+        paper_texts[name] = truncate_to_tokens("\n\n".join(pages), MAX_TOKENS_PER_PAPER)
+        paper_meta[name] = parse_paper_meta(pages[0] if pages else "")
+    return paper_texts, paper_meta
+
+
+def route_start(state):
+    """Picks the entry node: fused reader+analyst for small inputs,
+    the full reader -> analyst path otherwise."""
+    total_chars = sum(len(text) for text in state["paper_texts"].values())
+    if total_chars < FUSED_READER_MAX_CHARS:
+        return "reader_analyst"
+    return "reader"
+
+
+def route_after_fused(state):
+    """Falls back to the full reader -> analyst path if the fused node
+    couldn't produce both outputs."""
+    if state["extraction"] and state["analysis"]:
+        return "writer"
+    return "reader"
 
 
 def build_graph():
     """Sets up the LangGraph pipeline: reader -> analyst -> writer.
 
     Each node is a function that takes state and returns updates.
-    Could add conditional edges here later (e.g., skip analyst for
-    short papers, or loop back to writer if quality check fails).
+    Small inputs skip the separate reader/analyst hops and go through
+    a single fused node instead (see route_start).
     """
     graph = StateGraph(PipelineState)
 
     graph.add_node("reader", reader_node)
     graph.add_node("analyst", analyst_node)
+    graph.add_node("reader_analyst", reader_analyst_node)
     graph.add_node("writer", writer_node)
 
-    graph.add_edge(START, "reader")
+    graph.add_conditional_edges(START, route_start, ["reader_analyst", "reader"])
+    graph.add_conditional_edges("reader_analyst", route_after_fused, ["writer", "reader"])
     graph.add_edge("reader", "analyst")
     graph.add_edge("analyst", "writer")
     graph.add_edge("writer", END)
@@ -60,18 +84,42 @@ def build_graph():
     return graph.compile()
 
 
-def qa_loop(summary_text, paper_texts):
+async def _ainput(prompt):
+    """input() that doesn't block the event loop and survives Ctrl+C.
+
+    Under asyncio.run, Ctrl+C cancels the main task instead of raising
+    KeyboardInterrupt, so a plain input() (or one in to_thread) keeps
+    waiting for Enter. Reading in a daemon thread lets the await get
+    cancelled right away, and the thread won't hold up interpreter exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read():
+        try:
+            line = input(prompt)
+        except Exception as e:  # EOFError when stdin closes
+            loop.call_soon_threadsafe(deliver, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(deliver, future.set_result, line)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def qa_loop(summary_text, store):
     """Interactive Q&A with RAG retrieval.
 
-    Builds a vector store from the papers, then for each question
+    Takes an already-built vector store, then for each question
     retrieves relevant chunks and sends them to the LLM along with
     the summary. Keeps conversation history so follow-ups work.
+    Answers are streamed, so the first words show up after roughly
+    one network round-trip instead of after the whole completion.
     """
-    client = OpenAI()
-
-    print("\nBuilding vector store for Q&A...")
-    collection = build_vector_store(paper_texts)
-
     messages = [
         {
             "role": "system",
@@ -93,8 +141,8 @@ def qa_loop(summary_text, paper_texts):
 
     while True:
         try:
-            question = input("\nYou: ").strip()
-        except (EOFError, KeyboardInterrupt):
+            question = (await _ainput("\nYou: ")).strip()
+        except (EOFError, KeyboardInterrupt, asyncio.CancelledError):
             print("\nExiting Q&A mode.")
             break
 
@@ -102,8 +150,10 @@ def qa_loop(summary_text, paper_texts):
             print("Exiting Q&A mode. Goodbye!")
             break
 
-        # pull relevant chunks from the vector store
-        relevant_chunks = retrieve(collection, question)
+        # pull relevant chunks from the vector store -- a line with several
+        # questions ("What data? How big?") retrieves for each part at once
+        sub_questions = [q for q in re.split(r"(?<=\?)\s+", question) if q]
+        relevant_chunks = await aretrieve(store, sub_questions)
         context = "\n\n".join(relevant_chunks) if relevant_chunks else ""
 
         user_content = question
@@ -115,18 +165,27 @@ def qa_loop(summary_text, paper_texts):
 
         messages.append({"role": "user", "content": user_content})
 
-        response = client.chat.completions.create(
+        stream = await aclient.chat.completions.create(
             model=LLM_MODEL,
             messages=messages,
             temperature=0.3,
+            stream=True,
         )
 
-        answer = response.choices[0].message.content
+        print("\nAssistant: ", end="", flush=True)
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                token = chunk.choices[0].delta.content
+                parts.append(token)
+                print(token, end="", flush=True)
+        print()
+
+        answer = "".join(parts)
         messages.append({"role": "assistant", "content": answer})
-        print(f"\nAssistant: {answer}")
 
 
-def main():
+async def main():
     output_file = OUTPUT_DIR / "summary.md"
 
     # skip the pipeline if we just want to ask questions
@@ -136,12 +195,14 @@ def main():
             print("Run without --qa first to generate a summary.")
             raise SystemExit(1)
         summary_text = output_file.read_text()
-        paper_texts = load_paper_texts()
-        qa_loop(summary_text, paper_texts)
+        paper_texts, _ = load_paper_texts()
+        print("\nBuilding vector store for Q&A...")
+        store = await build_vector_store_async(paper_texts)
+        await qa_loop(summary_text, store)
         return
 
     # load papers
-    paper_texts = load_paper_texts()
+    paper_texts, paper_meta = load_paper_texts()
     if not paper_texts:
         print(f"No PDF files found in {PAPERS_DIR}")
         print("Add research papers to data/papers/ and run again.")
@@ -151,36 +212,66 @@ def main():
     for name in paper_texts:
         print(f"  - {name}")
 
-    # build and run the graph
-    print("\nRunning pipeline: reader -> analyst -> writer\n")
-    app = build_graph()
-
-    result = app.invoke({
-        "paper_texts": paper_texts,
-        "extraction": "",
-        "analysis": "",
-        "summary": "",
-    })
-
-    # save output
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    output_file.write_text(result["summary"])
-    print(f"\nSummary saved to {output_file}")
-    print("\n" + "=" * 60)
-    print("FINAL SUMMARY")
-    print("=" * 60)
-    print(result["summary"])
+    # index the papers for Q&A in the background -- the embedding calls
+    # overlap with the LLM calls below instead of running after them
+    cancel_indexing = threading.Event()
+    store_task = asyncio.create_task(
+        build_vector_store_async(paper_texts, cancel_indexing)
+    )
 
-    # offer Q&A after summarization
-    print("\nWould you like to ask questions about the paper(s)?")
     try:
-        enter_qa = input("Enter Q&A mode? (y/n): ").strip().lower()
-    except (EOFError, KeyboardInterrupt):
-        enter_qa = "n"
+        # build and run the graph
+        if route_start({"paper_texts": paper_texts}) == "reader_analyst":
+            print("\nRunning pipeline: reader+analyst -> writer\n")
+        else:
+            print("\nRunning pipeline: reader -> analyst -> writer\n")
+        app = build_graph()
+
+        # nodes are async, so the graph has to go through ainvoke
+        result = await app.ainvoke({
+            "paper_texts": paper_texts,
+            "paper_meta": paper_meta,
+            "extraction": "",
+            "analysis": "",
+            "summary": "",
+        })
+
+        # save output
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        output_file.write_text(result["summary"])
+        print(f"\nSummary saved to {output_file}")
+        print("\n" + "=" * 60)
+        print("FINAL SUMMARY")
+        print("=" * 60)
+        print(result["summary"])
+
+        # offer Q&A after summarization
+        print("\nWould you like to ask questions about the paper(s)?")
+        try:
+            enter_qa = (await _ainput("Enter Q&A mode? (y/n): ")).strip().lower()
+        except (EOFError, KeyboardInterrupt, asyncio.CancelledError):
+            print()
+            enter_qa = "n"
 
-    if enter_qa in ("y", "yes"):
-        qa_loop(result["summary"], paper_texts)
+        if enter_qa not in ("y", "yes"):
+            return
+
+        try:
+            store = await store_task
+        except OpenAIError as e:
+            print(f"\nCouldn't build the Q&A index: {e}")
+            print("The summary is saved -- try again later with: python run.py --qa")
+            raise SystemExit(1)
+    finally:
+        # on every way out except a finished index (declined Q&A, a
+        # pipeline error, Ctrl+C) stop embedding after the current batch.
+        # Cancelling the task alone doesn't stop its worker thread, and
+        # interpreter shutdown would wait for it to embed everything.
+        if not store_task.done():
+            cancel_indexing.set()
+            store_task.cancel()
 
+    await qa_loop(result["summary"], store)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -12,6 +12,7 @@ from typing import TypedDict
 
 class PipelineState(TypedDict):
     paper_texts: dict[str, str]  # raw PDF text keyed by filename
+    paper_meta: dict[str, dict[str, str]]  # title/authors/abstract parsed from page 1
     extraction: str               # structured info pulled out by the reader
     analysis: str                 # critical analysis from the analyst
     summary: str                  # final markdown report
@@ -0,0 +1,34 @@
+"""
+Token-aware truncation.
+
+Cutting paper text at a fixed character count is only a rough proxy for
+the model's context budget, so anything that needs to cap text before
+sending it to the LLM goes through here instead.
+"""
+
+import functools
+
+import tiktoken
+
+from config import LLM_MODEL
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    # loading the BPE ranks isn't free, so only do it once per model
+    return tiktoken.encoding_for_model(model)
+
+
+def truncate_to_tokens(text, max_tokens, model=LLM_MODEL, marker=""):
+    """Returns text cut down to at most max_tokens tokens for model.
+
+    Cuts on a token boundary, so multi-byte characters never get split.
+    If the text had to be cut, marker is appended to flag it.
+    """
+    enc = _encoding(model)
+    # papers about LLMs can literally contain "<|endoftext|>" -- treat
+    # special-token strings as plain text instead of raising
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens]) + marker